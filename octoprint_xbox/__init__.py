@@ -13,15 +13,19 @@ import math
 import time
 import logging
 import json
+from collections import namedtuple
 
 
 class ModernXboxController:
     def __init__(self):
         self.reset_state()
         self.max_analog_val = math.pow(2, 15)
+        self.max_trigger_val = 1023.0  # Xbox One/Series triggers report 0-1023, Xbox 360 report 0-255
+        self.learn_trigger_range = True  # Widen max_trigger_val if a larger value is seen
         self.debug_mode = False
         self._logger = logging.getLogger("octoprint.plugins.xbox")
         self.movement_threshold = 0.15  # Threshold for stick movement
+        self.trigger_threshold = 0.05   # Threshold for trigger pull
         self.last_processed_time = time.time()
         self.process_interval = 0.05  # Process every 50ms
 
@@ -96,6 +100,22 @@ class ModernXboxController:
                         if not self.debug_mode:
                             self._logger.info(f"Right Y updated: {self.right_y:.3f}")
 
+                elif event.code == "ABS_Z":  # Left trigger
+                    self.update_trigger_range(event.state)
+                    raw_value = event.state / self.max_trigger_val
+                    new_value = 0.0 if raw_value < self.trigger_threshold else min(1.0, raw_value)
+                    if abs(new_value - self.left_trigger) > 0.01:
+                        self.left_trigger = new_value
+                        self.has_new_movement = True
+
+                elif event.code == "ABS_RZ":  # Right trigger
+                    self.update_trigger_range(event.state)
+                    raw_value = event.state / self.max_trigger_val
+                    new_value = 0.0 if raw_value < self.trigger_threshold else min(1.0, raw_value)
+                    if abs(new_value - self.right_trigger) > 0.01:
+                        self.right_trigger = new_value
+                        self.has_new_movement = True
+
             elif event.ev_type == "Key":  # Button inputs
                 if event.code == "BTN_SOUTH":  # A button
                     self.a_pressed = event.state == 1
@@ -105,12 +125,36 @@ class ModernXboxController:
                     self.x_pressed = event.state == 1
                 elif event.code == "BTN_NORTH":  # Y button
                     self.y_pressed = event.state == 1
+                elif event.code == "BTN_TL":  # Left bumper
+                    self.left_bumper = event.state == 1
+                elif event.code == "BTN_TR":  # Right bumper
+                    self.right_bumper = event.state == 1
 
             return True
         except Exception as e:
             self._logger.error(f"Error processing controller event: {str(e)}")
             return False
 
+    @staticmethod
+    def trigger_range_for(device_name):
+        """Guess the full-scale trigger value from the device name.
+
+        Only pads that name themselves as Xbox 360 get 0-255; everything else assumes
+        0-1023, so a wrong guess under-scales the triggers rather than over-scaling them.
+        """
+        return 255.0 if "360" in (device_name or "") else 1023.0
+
+    def update_trigger_range(self, state):
+        """Widen the trigger range if the controller reports a value above it.
+
+        Values read before widening were over-scaled, which is why the starting range
+        is the widest one a supported pad is expected to report.
+        """
+        if not self.learn_trigger_range or state <= self.max_trigger_val:
+            return
+        self.max_trigger_val = float(state)
+        self._logger.info(f"Trigger range widened to 0-{self.max_trigger_val:.0f}")
+
     def read(self):
         """Read and process all pending controller events with improved error handling"""
         try:
@@ -134,9 +178,313 @@ class ModernXboxController:
             'left_x': self.left_x if abs(self.left_x) > self.movement_threshold else 0,
             'left_y': self.left_y if abs(self.left_y) > self.movement_threshold else 0,
             'right_x': self.right_x if abs(self.right_x) > self.movement_threshold else 0,
-            'right_y': self.right_y if abs(self.right_y) > self.movement_threshold else 0
+            'right_y': self.right_y if abs(self.right_y) > self.movement_threshold else 0,
+            'left_trigger': self.left_trigger if self.left_trigger > self.trigger_threshold else 0,
+            'right_trigger': self.right_trigger if self.right_trigger > self.trigger_threshold else 0
+        }
+
+class TelemetryPublisher:
+    """Samples pen position/state at a fixed rate and pushes delta-encoded batches to the UI.
+
+    Positions are sent in hundredths of a millimetre. Each batch carries one absolute
+    ``base`` sample followed by ``frames`` of ``[dx, dy, dpen, dqueue]`` deltas. Unchanged
+    samples are skipped and empty batches are never sent, so the push rate is bounded by
+    the batch interval regardless of how many browsers are connected.
+    """
+
+    def __init__(self, sample_fn, bounds_fn, send_fn, rate=20.0, batch_interval=0.25):
+        self._sample_fn = sample_fn  # Returns (x, y, drawing, queue_depth)
+        self._bounds_fn = bounds_fn  # Returns (min_x, min_y, max_x, max_y)
+        self._send_fn = send_fn
+        self.rate = max(1.0, min(60.0, float(rate)))
+        self.batch_interval = max(0.05, float(batch_interval))
+        self._logger = logging.getLogger("octoprint.plugins.xbox")
+        self._stop_event = Event()
+        self._thread = None
+        self._reset_batch()
+        self._last_sample = None
+        self._seq = 0
+        self._clear_pending = False
+
+    def _reset_batch(self):
+        self._base = None
+        self._frames = []
+
+    def start(self):
+        """Start the sampling thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._last_sample = None
+        self._reset_batch()
+        self._thread = Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        self._logger.info(f"Telemetry started at {self.rate:.0f} Hz (batch every {self.batch_interval:.2f}s)")
+
+    def stop(self):
+        """Stop the sampling thread, flushing any pending frames"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        self._logger.info("Telemetry stopped")
+
+    def request_clear(self):
+        """Ask browsers to wipe their preview with the next batch"""
+        self._clear_pending = True
+
+    def _run(self):
+        sample_period = 1.0 / self.rate
+        next_flush = time.time() + self.batch_interval
+        while not self._stop_event.wait(sample_period):
+            try:
+                self._sample()
+                if time.time() >= next_flush:
+                    self._flush()
+                    next_flush = time.time() + self.batch_interval
+            except Exception as e:
+                self._logger.error(f"Error publishing telemetry: {str(e)}")
+        self._flush()
+
+    def _sample(self):
+        x, y, drawing, queue_depth = self._sample_fn()
+        sample = (int(round(x * 100)), int(round(y * 100)), 1 if drawing else 0, int(queue_depth))
+
+        if sample == self._last_sample:
+            return  # Nothing changed, skip this frame
+
+        if self._base is None:
+            self._base = sample
+        else:
+            last = self._last_sample
+            self._frames.append([sample[0] - last[0],
+                                 sample[1] - last[1],
+                                 sample[2] - last[2],
+                                 sample[3] - last[3]])
+        self._last_sample = sample
+
+    def _flush(self):
+        if self._base is None and not self._clear_pending:
+            return
+
+        message = {
+            "type": "telemetry",
+            "seq": self._seq,
+            "bounds": [round(v, 2) for v in self._bounds_fn()],
+            "base": list(self._base or self._last_sample or (0, 0, 0, 0)),
+            "frames": self._frames
+        }
+        if self._clear_pending:
+            message["clear"] = True
+            self._clear_pending = False
+
+        self._seq += 1
+        self._reset_batch()
+        self._send_fn(message)
+
+SoftLimitsIndex = namedtuple("SoftLimitsIndex", "min_x min_y max_x max_y max_z cell_w cell_h zones grid")
+
+class SoftLimits:
+    """Bed bounds and user-defined polygon keep-out zones used to clip jog targets.
+
+    Bounds follow the printer profile origin (``lowerleft`` or ``center``). Zones are
+    indexed into a uniform grid whenever the profile or settings change, so each jog
+    target is only tested against the few zones overlapping its grid cell.
+
+    ``configure`` runs on OctoPrint's event/settings threads while the controller thread
+    clips jogs, so bounds, zones and grid live in one snapshot that is built off to the
+    side and swapped in with a single assignment. Readers take the snapshot once per call.
+    """
+
+    GRID_CELLS = 32        # Grid resolution along each axis
+    CLIP_ITERATIONS = 8    # Bisection steps when pulling a target out of a zone
+
+    def __init__(self):
+        self._logger = logging.getLogger("octoprint.plugins.xbox")
+        self._index = self._build_index(0.0, 0.0, 200.0, 200.0, 200.0, [])
+
+    @property
+    def min_x(self):
+        return self._index.min_x
+
+    @property
+    def min_y(self):
+        return self._index.min_y
+
+    @property
+    def max_x(self):
+        return self._index.max_x
+
+    @property
+    def max_y(self):
+        return self._index.max_y
+
+    @property
+    def max_z(self):
+        return self._index.max_z
+
+    def configure(self, width, depth, height, origin, zones=None):
+        """Recompute bounds from the profile volume and rebuild the zone index"""
+        if origin == "center":
+            min_x, max_x = -width / 2, width / 2
+            min_y, max_y = -depth / 2, depth / 2
+        else:
+            min_x, max_x = 0.0, width
+            min_y, max_y = 0.0, depth
+
+        parsed = []
+        for raw in zones or []:
+            zone = self.parse_zone(raw)
+            if zone is not None:
+                parsed.append(zone)
+
+        index = self._build_index(min_x, min_y, max_x, max_y, height, parsed)
+        self._index = index  # Single swap, see class docstring
+
+        self._logger.info(f"Soft limits: X[{min_x}, {max_x}] Y[{min_y}, {max_y}] Z[0, {height}] "
+                          f"(origin {origin}), {len(parsed)} keep-out zone(s) "
+                          f"in {len(index.grid)} grid cell(s)")
+
+    def parse_zone(self, raw):
+        """Turn a settings entry into a zone dict, or None if it is not a usable polygon.
+
+        Points may be a list of ``[x, y]`` pairs or a string like ``"10,10 40,10 40,30"``.
+        """
+        try:
+            name = raw.get("name") or "Unnamed zone"
+            points = raw.get("points") or []
+            if isinstance(points, str):
+                points = [pair.split(",") for pair in points.replace(";", " ").split()]
+            points = [(float(x), float(y)) for x, y in points]
+        except Exception as e:
+            self._logger.warning(f"Ignoring invalid keep-out zone {raw!r}: {str(e)}")
+            return None
+
+        if len(points) < 3:
+            self._logger.warning(f"Ignoring keep-out zone '{name}': needs at least 3 points")
+            return None
+
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        return {
+            "name": name,
+            "points": tuple(points),
+            "bbox": (min(xs), min(ys), max(xs), max(ys))
         }
 
+    @classmethod
+    def _cell(cls, index, x, y):
+        i = int((x - index.min_x) / index.cell_w)
+        j = int((y - index.min_y) / index.cell_h)
+        return (max(0, min(cls.GRID_CELLS - 1, i)),
+                max(0, min(cls.GRID_CELLS - 1, j)))
+
+    @classmethod
+    def _build_index(cls, min_x, min_y, max_x, max_y, max_z, zones):
+        index = SoftLimitsIndex(min_x, min_y, max_x, max_y, max_z,
+                                max((max_x - min_x) / cls.GRID_CELLS, 1e-6),
+                                max((max_y - min_y) / cls.GRID_CELLS, 1e-6),
+                                tuple(zones), {})
+
+        grid = {}
+        for zone_index, zone in enumerate(zones):
+            x0, y0, x1, y1 = zone["bbox"]
+            i0, j0 = cls._cell(index, x0, y0)
+            i1, j1 = cls._cell(index, x1, y1)
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    grid.setdefault((i, j), []).append(zone_index)
+        return index._replace(grid={cell: tuple(indices) for cell, indices in grid.items()})
+
+    @staticmethod
+    def _point_in_polygon(x, y, points):
+        inside = False
+        j = len(points) - 1
+        for i in range(len(points)):
+            xi, yi = points[i]
+            xj, yj = points[j]
+            if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+                inside = not inside
+            j = i
+        return inside
+
+    @staticmethod
+    def _segments_intersect(p1, p2, q1, q2):
+        def cross(o, a, b):
+            return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+        d1 = cross(q1, q2, p1)
+        d2 = cross(q1, q2, p2)
+        d3 = cross(p1, p2, q1)
+        d4 = cross(p1, p2, q2)
+        return ((d1 > 0) != (d2 > 0) or d1 == 0 or d2 == 0) and \
+               ((d3 > 0) != (d4 > 0) or d3 == 0 or d4 == 0) and \
+               min(p1[0], p2[0]) <= max(q1[0], q2[0]) and min(q1[0], q2[0]) <= max(p1[0], p2[0]) and \
+               min(p1[1], p2[1]) <= max(q1[1], q2[1]) and min(q1[1], q2[1]) <= max(p1[1], p2[1])
+
+    def _in_keepout(self, index, x, y):
+        for zone_index in index.grid.get(self._cell(index, x, y), ()):
+            zone = index.zones[zone_index]
+            x0, y0, x1, y1 = zone["bbox"]
+            if x0 <= x <= x1 and y0 <= y <= y1 and self._point_in_polygon(x, y, zone["points"]):
+                return True
+        return False
+
+    def segment_blocked(self, from_x, from_y, to_x, to_y):
+        """Check whether a straight move touches any keep-out zone.
+
+        Used for long moves like the shake clear, so it checks every zone whose
+        bounding box overlaps the move rather than walking the grid.
+        """
+        index = self._index
+        p1, p2 = (from_x, from_y), (to_x, to_y)
+        seg_x0, seg_x1 = min(from_x, to_x), max(from_x, to_x)
+        seg_y0, seg_y1 = min(from_y, to_y), max(from_y, to_y)
+        for zone in index.zones:
+            x0, y0, x1, y1 = zone["bbox"]
+            if seg_x1 < x0 or seg_x0 > x1 or seg_y1 < y0 or seg_y0 > y1:
+                continue
+            points = zone["points"]
+            if self._point_in_polygon(from_x, from_y, points) or self._point_in_polygon(to_x, to_y, points):
+                return True
+            for i in range(len(points)):
+                if self._segments_intersect(p1, p2, points[i - 1], points[i]):
+                    return True
+        return False
+
+    def clamp(self, x, y):
+        """Clamp a point to the bed bounds"""
+        index = self._index
+        return (max(index.min_x, min(index.max_x, x)),
+                max(index.min_y, min(index.max_y, y)))
+
+    def clip(self, from_x, from_y, to_x, to_y):
+        """Clip a jog from the current position to a target against bounds and zones.
+
+        Jog steps are small, so only the target is tested; if it lands in a zone the
+        target is pulled back along the jog to the last point outside it.
+        """
+        index = self._index
+        to_x = max(index.min_x, min(index.max_x, to_x))
+        to_y = max(index.min_y, min(index.max_y, to_y))
+        if not index.grid or not self._in_keepout(index, to_x, to_y):
+            return to_x, to_y
+
+        # Already inside a zone (e.g. after homing): let the operator drive back out
+        if self._in_keepout(index, from_x, from_y):
+            return to_x, to_y
+
+        safe, blocked = 0.0, 1.0
+        for _ in range(self.CLIP_ITERATIONS):
+            mid = (safe + blocked) / 2
+            if self._in_keepout(index, from_x + (to_x - from_x) * mid, from_y + (to_y - from_y) * mid):
+                blocked = mid
+            else:
+                safe = mid
+        return from_x + (to_x - from_x) * safe, from_y + (to_y - from_y) * safe
+
 class XboxPlugin(octoprint.plugin.SettingsPlugin,
                 octoprint.plugin.AssetPlugin,
                 octoprint.plugin.ShutdownPlugin,
@@ -152,16 +500,26 @@ class XboxPlugin(octoprint.plugin.SettingsPlugin,
         self.bConnected = False
         self.bStarted = False
         self.joy = None
-        self.maxX = 0.0  # Will be set from printer profile
-        self.maxY = 0.0  # Will be set from printer profile
+        self.soft_limits = SoftLimits()  # Bounds and keep-out zones, set from printer profile
         self.current_x = 0.0
         self.current_y = 0.0
         self.movement_speed = 1000  # Base movement speed (mm/min)
         self.drawing = False  # Track if we're currently drawing
         self.z_drawing = 0.2  # Z height when drawing
         self.z_travel = 1.0   # Z height when not drawing
+        self.current_z = 0.0  # Last commanded Z height
+        self.z_jog_step = 0.05  # Z jog per movement tick at full trigger (mm)
+        self.z_jog_speed = 300  # Z jog feed rate (mm/min)
+        self.feedrate_percent = 100  # Last M220 value sent
+        self.feedrate_min = 50       # Feed rate with left trigger fully pulled (%)
+        self.feedrate_max = 200      # Feed rate with right trigger fully pulled (%)
+        self.feedrate_step = 5       # Feed rate quantization (%)
+        self.feedrate_interval = 0.5  # Minimum time between M220 updates (s)
+        self._last_feedrate_time = 0.0
         self.controller_thread = None  # Initialize the controller thread
         self.active_controller = None  # Initialize the active controller
+        self.telemetry = None  # Live preview publisher, created on controller start
+        self._queue_depth_warned = False  # Only warn once about missing OctoPrint queues
 
         self._position_lock = Lock()  # For protecting position updates
         self._state_lock = Lock()     # For protecting state variables
@@ -220,33 +578,28 @@ class XboxPlugin(octoprint.plugin.SettingsPlugin,
         return True
 
     def update_printer_dimensions(self):
-        """Update max X/Y dimensions from the active printer profile"""
+        """Update soft limits (X/Y/Z dimensions and keep-out zones) from the active printer profile"""
         try:
             profile = self._printer_profile_manager.get_current_or_default()
             volume = profile.get("volume", {})
 
             # Get dimensions, defaulting to 200mm if not found
-            self.maxX = float(volume.get("width", 200))
-            self.maxY = float(volume.get("depth", 200))
-
-            # Get origin to adjust coordinates if needed
+            width = float(volume.get("width", 200))
+            depth = float(volume.get("depth", 200))
+            height = float(volume.get("height", 200))
             origin = volume.get("origin", "lowerleft")
-            if origin == "center":
-                # Adjust for center origin
-                self.maxX = self.maxX / 2
-                self.maxY = self.maxY / 2
 
-            self._logger.info(f"Printer dimensions updated: X={self.maxX}mm, Y={self.maxY}mm, Origin={origin}")
+            self.soft_limits.configure(width, depth, height, origin, self._settings.get(["keepout_zones"]))
+            self._logger.info(f"Printer dimensions updated: X={width}mm, Y={depth}mm, Z={height}mm, Origin={origin}")
 
             # Update current position if it's outside new bounds
-            self.current_x = min(self.current_x, self.maxX)
-            self.current_y = min(self.current_y, self.maxY)
+            with self._position_lock:
+                self.current_x, self.current_y = self.soft_limits.clamp(self.current_x, self.current_y)
 
         except Exception as e:
             self._logger.error(f"Error updating printer dimensions: {str(e)}")
             # Fall back to default values
-            self.maxX = 200.0
-            self.maxY = 200.0
+            self.soft_limits.configure(200.0, 200.0, 200.0, "lowerleft", self._settings.get(["keepout_zones"]))
 
     def start_controller_thread(self):
         """Start the controller input thread"""
@@ -262,6 +615,22 @@ class XboxPlugin(octoprint.plugin.SettingsPlugin,
             self._logger.info(f"Starting controller with debug_mode: {debug_mode}")
             self.joy.debug_mode = debug_mode
 
+            # Trigger channel settings
+            trigger_max = self._get_setting("trigger_max", self._settings.get_int)
+            if trigger_max > 0:
+                self.joy.max_trigger_val = float(trigger_max)
+                self.joy.learn_trigger_range = False
+            else:
+                self.joy.max_trigger_val = ModernXboxController.trigger_range_for(self.active_controller)
+            self._logger.info(f"Trigger range: 0-{self.joy.max_trigger_val:.0f}")
+            self.z_jog_step = self._get_setting("z_jog_step", self._settings.get_float)
+            self.z_jog_speed = self._get_setting("z_jog_speed", self._settings.get_int)
+            self.feedrate_min = self._get_setting("feedrate_min", self._settings.get_int)
+            self.feedrate_max = self._get_setting("feedrate_max", self._settings.get_int)
+            self.feedrate_step = max(1, self._get_setting("feedrate_step", self._settings.get_int))
+            self.feedrate_interval = self._get_setting("feedrate_interval", self._settings.get_float)
+            self.feedrate_percent = 100
+
             # Home all axes before starting
             self._logger.info("Homing all axes...")
             self.send("G28 XY")
@@ -270,10 +639,13 @@ class XboxPlugin(octoprint.plugin.SettingsPlugin,
             # Reset current position after homing
             self.current_x = 0.0
             self.current_y = 0.0
+            self.current_z = 0.0
 
             # Test logging to verify logger functionality
             self._logger.info("Testing logger functionality")
 
+            self.start_telemetry()
+
             self.controller_thread = Thread(target=self.threadAcceptInput)
             self.controller_thread.daemon = True
             self.controller_thread.start()
@@ -330,6 +702,8 @@ class XboxPlugin(octoprint.plugin.SettingsPlugin,
             # Reset the thread
             self.controller_thread = None
 
+            self.stop_telemetry()
+
             # Send final status update
             self._plugin_manager.send_plugin_message(self._identifier, {
                 "type": "controller_status",
@@ -346,15 +720,105 @@ class XboxPlugin(octoprint.plugin.SettingsPlugin,
             self.joy = None
             self.controller_thread = None
 
-    def move_to_position(self):
-        """Enhanced position updates with better error handling"""
+    def start_telemetry(self):
+        """Start publishing live position/pen telemetry for the preview canvas"""
+        if not self._settings.get_boolean(["telemetry_enabled"]):
+            return
+
+        self.stop_telemetry()
+
+        rate = self._get_setting("telemetry_rate", self._settings.get_float)
+        batch_interval = self._get_setting("telemetry_batch_interval", self._settings.get_float)
+
+        # The preview is optional, never let it block controller activation
         try:
-            gcode = f'G1 X{self.current_x:.2f} Y{self.current_y:.2f} F{self.movement_speed}'
-            self._logger.info(f"Sending movement: {gcode}")
-            self._printer.commands([gcode])
+            self.telemetry = TelemetryPublisher(
+                self.get_telemetry_sample,
+                lambda: (self.soft_limits.min_x, self.soft_limits.min_y,
+                         self.soft_limits.max_x, self.soft_limits.max_y),
+                lambda message: self._plugin_manager.send_plugin_message(self._identifier, message),
+                rate=rate,
+                batch_interval=batch_interval
+            )
+            self.telemetry.start()
+        except Exception as e:
+            self._logger.error(f"Failed to start telemetry: {str(e)}")
+            self.telemetry = None
+
+    def stop_telemetry(self):
+        """Stop the telemetry publisher if it is running"""
+        if self.telemetry is not None:
+            self.telemetry.stop()
+            self.telemetry = None
+
+    def get_telemetry_sample(self):
+        """Snapshot of (x, y, drawing, queue_depth) for the telemetry publisher"""
+        with self._position_lock:
+            x, y, drawing = self.current_x, self.current_y, self.drawing
+        # Read OctoPrint's queues outside the lock the controller thread jogs under
+        return x, y, drawing, self.get_queue_depth()
+
+    def get_queue_depth(self):
+        """Best-effort count of commands waiting in OctoPrint's communication queues.
+
+        OctoPrint has no public API for this, so it reads private MachineCom queues and
+        reports 0 (logging once) if they are not there.
+        """
+        comm = getattr(self._printer, "_comm", None)
+        if comm is None:
+            return 0  # Not connected
+
+        depth = 0
+        for name in ("_command_queue", "_send_queue"):
+            try:
+                depth += getattr(comm, name).qsize()
+            except Exception as e:
+                if not self._queue_depth_warned:
+                    self._queue_depth_warned = True
+                    self._logger.warning(f"Cannot read OctoPrint queue {name}, queue depth "
+                                         f"in the live preview will be incomplete: {str(e)}")
+        return depth
+
+    def dispatch(self, commands):
+        """Send one movement tick's worth of commands to the printer in a single call"""
+        try:
+            self._logger.info(f"Sending movement: {commands}")
+            self._printer.commands(commands)
         except Exception as e:
             self._logger.error(f"Error sending movement command: {str(e)}")
 
+    def get_trigger_commands(self, movement, current_time):
+        """Turn trigger positions into change-only Z jog and M220 commands.
+
+        With the left bumper held the triggers jog Z (left lowers, right raises),
+        otherwise they scale the feed rate between feedrate_min and feedrate_max.
+        M220 updates are quantized and rate-limited to feedrate_interval.
+        """
+        left = movement['left_trigger']
+        right = movement['right_trigger']
+        commands = []
+
+        if self.joy.left_bumper:
+            dz = (right - left) * self.z_jog_step
+            # Stay between the homed Z and the profile's build height
+            new_z = max(0.0, min(self.soft_limits.max_z, self.current_z + dz))
+            dz = round(new_z - self.current_z, 3)
+            if dz != 0:
+                self.current_z += dz  # Track what was sent so the Z guard stays in sync
+                commands.extend(["G91", f"G1 Z{dz:.3f} F{self.z_jog_speed}", "G90"])
+            return commands
+
+        percent = 100 + right * (self.feedrate_max - 100) - left * (100 - self.feedrate_min)
+        percent = int(round(percent / self.feedrate_step) * self.feedrate_step)
+        percent = max(self.feedrate_min, min(self.feedrate_max, percent))
+        if percent != self.feedrate_percent:
+            # Returning to 100% is never delayed, so a trigger release can't be lost
+            if percent == 100 or current_time - self._last_feedrate_time >= self.feedrate_interval:
+                self.feedrate_percent = percent
+                self._last_feedrate_time = current_time
+                commands.append(f"M220 S{percent}")
+        return commands
+
 
     def threadAcceptInput(self):
         """Enhanced thread function with continuous movement processing"""
@@ -389,33 +853,44 @@ class XboxPlugin(octoprint.plugin.SettingsPlugin,
                 # Process movement if enough time has passed
                 if current_time - last_movement_time >= movement_interval:
                     movement = self.joy.get_movement()
+                    moved = False
 
                     # Process X movement
                     if abs(movement['left_x']) > self.joy.movement_threshold:
                         with self._position_lock:
                             move_x = movement['left_x'] * 1.5
-                            new_x = max(0, min(self.maxX, self.current_x + move_x))
+                            new_x, _ = self.soft_limits.clip(self.current_x, self.current_y,
+                                                             self.current_x + move_x, self.current_y)
                             if new_x != self.current_x:
                                 self.current_x = new_x
                                 self._logger.info(f"Moving X to: {self.current_x:.2f}")
-                                self.move_to_position()
-                                last_movement_time = current_time
+                                moved = True
 
                     # Process Y movement
                     if abs(movement['right_y']) > self.joy.movement_threshold:
                         with self._position_lock:
                             move_y = movement['right_y'] * 1.5
-                            new_y = max(0, min(self.maxY, self.current_y + move_y))
+                            _, new_y = self.soft_limits.clip(self.current_x, self.current_y,
+                                                             self.current_x, self.current_y + move_y)
                             if new_y != self.current_y:
                                 self.current_y = new_y
                                 self._logger.info(f"Moving Y to: {self.current_y:.2f}")
-                                self.move_to_position()
-                                last_movement_time = current_time
+                                moved = True
+
+                    # Merge XY, Z jog and feed rate updates into one dispatch
+                    commands = []
+                    if moved:
+                        commands.append(f'G1 X{self.current_x:.2f} Y{self.current_y:.2f} F{self.movement_speed}')
+                    commands.extend(self.get_trigger_commands(movement, current_time))
+                    if commands:
+                        self.dispatch(commands)
+                        last_movement_time = current_time
 
                 # Process button presses (immediate)
                 if self.joy.a_pressed:
                     self.drawing = not self.drawing
-                    gcode = f'G1 Z{self.z_drawing if self.drawing else self.z_travel} F1000'
+                    self.current_z = self.z_drawing if self.drawing else self.z_travel
+                    gcode = f'G1 Z{self.current_z} F1000'
                     self._logger.info(f"Sending Z movement: {gcode}")
                     self.send(gcode)
 
@@ -438,6 +913,11 @@ class XboxPlugin(octoprint.plugin.SettingsPlugin,
                 if error_count >= max_errors:
                     break
 
+        # Don't leave a trigger feed rate override behind
+        if self.feedrate_percent != 100:
+            self.dispatch(["M220 S100"])
+            self.feedrate_percent = 100
+
         self._logger.info('Etch-A-Sketch mode terminated cleanly')
 
 
@@ -479,25 +959,51 @@ class XboxPlugin(octoprint.plugin.SettingsPlugin,
         """Simulate the etch-a-sketch shake clear motion"""
         # Lift the pen
         self.drawing = False
+        self.current_z = self.z_travel
         self.send(f'G1 Z{self.z_travel} F1000')
 
-        # Perform rapid zigzag motion
+        # Perform rapid zigzag motion, skipping any leg that would cross a keep-out zone
+        limits = self.soft_limits
+        corners = [(limits.min_x + 5, limits.min_y + 5),
+                   (limits.max_x - 5, limits.max_y - 5),
+                   (limits.max_x - 5, limits.min_y + 5),
+                   (limits.min_x + 5, limits.max_y - 5)]
+        x, y = self.current_x, self.current_y
+        skipped = 0
         for i in range(4):
-            self.send(f'G1 X{5} Y{5} F3000')
-            self.send(f'G1 X{self.maxX-5} Y{self.maxY-5} F3000')
-            self.send(f'G1 X{self.maxX-5} Y{5} F3000')
-            self.send(f'G1 X{5} Y{self.maxY-5} F3000')
+            for corner_x, corner_y in corners:
+                if limits.segment_blocked(x, y, corner_x, corner_y):
+                    skipped += 1
+                    continue
+                self.send(f'G1 X{corner_x} Y{corner_y} F3000')
+                x, y = corner_x, corner_y
+
+        if skipped:
+            self._logger.warning(f"Shake clear skipped {skipped} of {4 * len(corners)} moves crossing keep-out zones")
+            self._plugin_manager.send_plugin_message(self._identifier, {
+                "type": "shake_status",
+                "skipped": skipped,
+                "total": 4 * len(corners)
+            })
 
         # Return to starting position
         self.current_x = 0
         self.current_y = 0
         self.send('G28 X Y')
 
+        if self.telemetry is not None:
+            self.telemetry.request_clear()
+
     def on_after_startup(self):
         self._logger.info("Etch-A-Sketch Controller starting up")
         self._logger.info(f"Available routes: {app.url_map}")
         self.update_printer_dimensions()
 
+    def _get_setting(self, name, getter):
+        """Read a setting with the given getter, falling back to its default when empty or invalid"""
+        value = getter([name])
+        return self.get_settings_defaults()[name] if value is None else value
+
     def get_settings_defaults(self):
         return dict(
             max_x=200.0,
@@ -505,9 +1011,25 @@ class XboxPlugin(octoprint.plugin.SettingsPlugin,
             z_drawing=0.1,
             z_travel=1.0,
             base_speed=1000,
-            debug_mode=False
+            debug_mode=False,
+            telemetry_enabled=True,
+            telemetry_rate=20.0,
+            telemetry_batch_interval=0.25,
+            keepout_zones=[],  # [{"name": ..., "points": "x,y x,y x,y ..."}]
+            trigger_max=0,  # 0 = guess from the controller name (255 for Xbox 360, else 1023)
+            z_jog_step=0.05,
+            z_jog_speed=300,
+            feedrate_min=50,
+            feedrate_max=200,
+            feedrate_step=5,
+            feedrate_interval=0.5
         )
 
+    def on_settings_save(self, data):
+        octoprint.plugin.SettingsPlugin.on_settings_save(self, data)
+        # Rebuild the keep-out zone index with the new settings
+        self.update_printer_dimensions()
+
     def get_assets(self):
         return dict(
             js=["js/xbox.js"],
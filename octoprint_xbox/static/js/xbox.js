@@ -18,9 +18,24 @@ $(function() {
             return "No controller selected";
         });
 
+        // Live preview state, decoded from telemetry batches
+        self.previewPosition = ko.observable("--");
+        self.previewPenDown = ko.observable(false);
+        self.previewQueueDepth = ko.observable(0);
+        self.previewLast = null;
+        self.previewBounds = null;
+        self.previewSeq = null;
+
         // Initialize settings
         self.onBeforeBinding = function() {
             self.settings = self.settingsViewModel.settings.plugins.xbox;
+
+            // Redraw the zone overlay whenever zones are added, removed or edited
+            ko.computed(function() {
+                return ko.toJSON(self.settings.keepout_zones);
+            }).subscribe(function() {
+                self.clearPreview();
+            });
         };
 
         // Add periodic refresh functions
@@ -137,6 +152,132 @@ $(function() {
                 });
         };
 
+        // Keep-out zone management
+        self.addKeepoutZone = function() {
+            self.settings.keepout_zones.push({
+                name: ko.observable("Zone " + (self.settings.keepout_zones().length + 1)),
+                points: ko.observable("")
+            });
+        };
+
+        self.removeKeepoutZone = function(zone) {
+            self.settings.keepout_zones.remove(zone);
+        };
+
+        self.parseZonePoints = function(points) {
+            points = ko.unwrap(points) || [];
+            if (typeof points === "string") {
+                points = points.replace(/;/g, " ").trim().split(/\s+/).map(function(pair) {
+                    return pair.split(",");
+                });
+            }
+            return points.map(function(p) {
+                return [parseFloat(ko.unwrap(p[0])), parseFloat(ko.unwrap(p[1]))];
+            }).filter(function(p) {
+                return !isNaN(p[0]) && !isNaN(p[1]);
+            });
+        };
+
+        self.drawKeepoutZones = function(canvas, ctx) {
+            if (!self.settings || !self.settings.keepout_zones) return;
+
+            ctx.fillStyle = "rgba(217, 83, 79, 0.25)";
+            self.settings.keepout_zones().forEach(function(zone) {
+                var points = self.parseZonePoints(zone.points);
+                if (points.length < 3) return;
+
+                ctx.beginPath();
+                points.forEach(function(p, i) {
+                    var point = self.toCanvasPoint(canvas, p[0], p[1]);
+                    if (i === 0) {
+                        ctx.moveTo(point.x, point.y);
+                    } else {
+                        ctx.lineTo(point.x, point.y);
+                    }
+                });
+                ctx.closePath();
+                ctx.fill();
+            });
+        };
+
+        // Live preview canvas functions
+        // Wipe the drawing and redraw the keep-out zone overlay
+        self.clearPreview = function() {
+            self.previewLast = null;
+
+            var canvas = document.getElementById("xbox_preview_canvas");
+            if (!canvas) return;
+
+            var ctx = canvas.getContext("2d");
+            ctx.clearRect(0, 0, canvas.width, canvas.height);
+
+            var b = self.previewBounds;
+            if (b && b[2] > b[0] && b[3] > b[1]) {
+                self.drawKeepoutZones(canvas, ctx);
+            }
+        };
+
+        self.toCanvasPoint = function(canvas, x, y) {
+            var b = self.previewBounds;
+            var scale = Math.min(canvas.width / (b[2] - b[0]), canvas.height / (b[3] - b[1]));
+            return {
+                x: (x - b[0]) * scale,
+                y: canvas.height - (y - b[1]) * scale  // Printer Y points up
+            };
+        };
+
+        self.drawPreviewSample = function(canvas, ctx, sample) {
+            var point = self.toCanvasPoint(canvas, sample[0] / 100, sample[1] / 100);
+            var last = self.previewLast;
+
+            // Only draw segments travelled with the pen down
+            if (last && last.pen && sample[2]) {
+                ctx.beginPath();
+                ctx.moveTo(last.x, last.y);
+                ctx.lineTo(point.x, point.y);
+                ctx.stroke();
+            }
+            self.previewLast = {x: point.x, y: point.y, pen: sample[2]};
+        };
+
+        self.onTelemetry = function(data) {
+            var canvas = document.getElementById("xbox_preview_canvas");
+            if (!canvas) return;
+
+            var bounds = data.bounds;
+            if (data.clear || !self.previewBounds || bounds.join() !== self.previewBounds.join()) {
+                self.previewBounds = bounds;
+                self.clearPreview();
+            }
+            if (bounds[2] <= bounds[0] || bounds[3] <= bounds[1]) return;
+
+            // A missed batch (or a restarted publisher) means the last point is stale,
+            // so don't join the new base to it
+            if (self.previewSeq === null || data.seq !== self.previewSeq + 1) {
+                self.previewLast = null;
+            }
+            self.previewSeq = data.seq;
+
+            var ctx = canvas.getContext("2d");
+            ctx.strokeStyle = "#333";
+            ctx.lineWidth = 1.5;
+
+            // Rebuild absolute samples from the base sample and its deltas
+            var sample = data.base.slice();
+            self.drawPreviewSample(canvas, ctx, sample);
+            data.frames.forEach(function(frame) {
+                sample[0] += frame[0];
+                sample[1] += frame[1];
+                sample[2] += frame[2];
+                sample[3] += frame[3];
+                self.drawPreviewSample(canvas, ctx, sample);
+            });
+
+            self.previewPosition("X " + (sample[0] / 100).toFixed(2) + " / Y " + (sample[1] / 100).toFixed(2));
+            self.previewPenDown(sample[2] === 1);
+            self.previewQueueDepth(sample[3]);
+        };
+
         // Event handler for plugin messages
         self.onDataUpdaterPluginMessage = function(plugin, data) {
             if (plugin !== "xbox") return;
@@ -153,6 +294,14 @@ $(function() {
                 } else {
                     self.startPeriodicRefresh();
                 }
+            } else if (data.type === "telemetry") {
+                self.onTelemetry(data);
+            } else if (data.type === "shake_status") {
+                new PNotify({
+                    title: "Shake Clear Shortened",
+                    text: data.skipped + " of " + data.total + " shake moves were skipped because they cross a keep-out zone",
+                    type: "notice"
+                });
             }
         };
 